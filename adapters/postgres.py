@@ -1,21 +1,64 @@
-from asyncio import current_task
+import logging
+from asyncio import current_task, gather
 from typing import Optional
 
 from sqlalchemy.ext.asyncio import (create_async_engine,
                                     AsyncEngine,
                                     async_sessionmaker,
                                     async_scoped_session)
+from sqlalchemy.orm import Session
+
+from settings import DbSettings
 
 
 class AsyncSQLAlchemyAdapter:
-    def __init__(self, url: str, echo: bool = False) -> None:
+    def __init__(self,
+                 url: str,
+                 echo: bool = False,
+                 pool_size: int = 20,
+                 max_overflow: int = 30,
+                 pool_timeout: float = 30,
+                 pool_recycle: int = 1800,
+                 pool_pre_ping: bool = True,
+                 logger: Optional[logging.Logger] = None) -> None:
         self._url = url
+        self._logger = logger or logging.getLogger(__name__)
         self._echo = echo
+        self._pool_size = pool_size
+        self._max_overflow = max_overflow
+        self._pool_timeout = pool_timeout
+        self._pool_recycle = pool_recycle
+        self._pool_pre_ping = pool_pre_ping
         self._engine: Optional[AsyncEngine] = None
         self._session_factory: Optional[async_sessionmaker] = None
+        self._sync_session_class: Optional[type[Session]] = None
         self._async_scoped_session = None
         self.connect()
 
+    @classmethod
+    def from_settings(cls, settings: DbSettings, **kwargs) -> "AsyncSQLAlchemyAdapter":
+        return cls(
+            url=str(settings.SQLALCHEMY_DATABASE_URI),
+            echo=settings.DEBUG,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            **kwargs,
+        )
+
+    async def prewarm(self, n: Optional[int] = None):
+        # Open pool connections up front so first requests skip the connect handshake
+        # Overflow connections are discarded on checkin, so only pool_size can stay warm
+        _pool_size = self._engine.pool.size()
+        n = min(n or _pool_size, _pool_size)
+        _results = await gather(*(self._engine.connect().start() for _ in range(n)), return_exceptions=True)
+        await gather(*(_result.close() for _result in _results if not isinstance(_result, BaseException)))
+        for _result in _results:
+            if isinstance(_result, BaseException):
+                raise _result
+
     async def dispose(self):
         if self._engine:
             await self._engine.dispose()
@@ -24,12 +67,21 @@ class AsyncSQLAlchemyAdapter:
         self._engine = create_async_engine(
             url=self._url,
             echo=self._echo,
-            pool_size=5,
-            max_overflow=10,
+            pool_size=self._pool_size,
+            max_overflow=self._max_overflow,
+            pool_timeout=self._pool_timeout,
+            pool_recycle=self._pool_recycle,
+            pool_pre_ping=self._pool_pre_ping,
+            insertmanyvalues_page_size=1000,
+            use_insertmanyvalues=True,
+            query_cache_size=1200,
             future=True
         )
+        # Per-adapter Session subclass so session event listeners stay scoped to this adapter
+        self._sync_session_class = type(f"{type(self).__name__}Session", (Session,), {})
         self._session_factory = async_sessionmaker(
             bind=self._engine,
+            sync_session_class=self._sync_session_class,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
@@ -38,7 +90,7 @@ class AsyncSQLAlchemyAdapter:
             session_factory=self._session_factory,
             scopefunc=current_task,
         )
-        print(f"Connected")
+        self._logger.info("Connected")
 
     @property
     def async_scoped_session(self) -> async_scoped_session:
@@ -48,6 +100,13 @@ class AsyncSQLAlchemyAdapter:
     def engine(self):
         return self._engine
 
+    @property
+    def sync_session_class(self) -> type[Session]:
+        return self._sync_session_class
+
     @property
     def session_factory(self):
         return self._session_factory
+
+
+PgAsyncSQLAlchemyAdapter = AsyncSQLAlchemyAdapter
@@ -1,14 +1,61 @@
+import warnings
+from collections import OrderedDict
 from typing import Generic, Sequence, TypeVar, cast, Iterable
 
-from sqlalchemy import Select, insert
+from sqlalchemy import RowMapping, Select, delete, event, insert, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.util import LRUCache
 
-from base import BaseModel
+from entities.base import BaseModel
 
 T = TypeVar("T", bound=BaseModel)
 
 
+STMT_CACHE_KEY = "_stmt_cache"
+
+
+def _clear_stmt_cache(session: Session, *_):
+    _cache = session.info.get(STMT_CACHE_KEY)
+    if _cache:
+        _cache.clear()
+
+
+def _clear_stmt_cache_on_write(orm_execute_state: ORMExecuteState):
+    if not orm_execute_state.is_select:
+        _clear_stmt_cache(orm_execute_state.session)
+
+
+def register_stmt_cache_events(session_class: type[Session]):
+    # Any write through the session (flush, DML execute, commit, rollback) drops cached selects
+    # Flag lives on the class itself: event.contains() can report stale listeners for a new
+    # class that reuses the id of a garbage-collected one
+    if session_class.__dict__.get("_stmt_cache_events"):
+        return
+    for _identifier in ("after_flush", "after_commit", "after_soft_rollback"):
+        event.listen(session_class, _identifier, _clear_stmt_cache)
+    event.listen(session_class, "do_orm_execute", _clear_stmt_cache_on_write)
+    session_class._stmt_cache_events = True
+
+
+def _stmt_cache_copy(value):
+    # Callers get their own container, so mutating a result never leaks into the cache
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
 class BaseRepository(Generic[T]):
+    _stmt_cache_size: int = 256
+    # Shared compiled SQL cache for repository selects, kept apart from the engine
+    # cache so hot lookups are not evicted by ad-hoc statements. Statements only hit
+    # it when values are passed as bindparam(...) / column comparisons, not when SQL
+    # is built from literal strings.
+    _compiled_cache: LRUCache = LRUCache(1200)
+
     def __init__(self):
         self._session: AsyncSession | None = None
 
@@ -32,47 +79,107 @@ class BaseRepository(Generic[T]):
     def as_dict(self):
         return {c.name: getattr(self, c.name) for c in self.__table__.columns}
 
+    @staticmethod
+    def _stmt_cache_key(stmt, handler) -> tuple | None:
+        # SQLAlchemy's own cache key covers dialect-specific constructs and loader options
+        # without compiling; execution options and bound values are added on top
+        _cache_key = stmt._generate_cache_key()
+        if _cache_key is None:
+            return None
+        _params = tuple(
+            tuple(_value) if isinstance(_value, list) else _value
+            for _value in (_bind.effective_value for _bind in _cache_key.bindparams)
+        )
+        try:
+            # The handler shapes the cached value, so the same statement run through
+            # run_select_stmt_for_one and run_select_stmt_for_all must not share an entry
+            _key = (
+                handler.__code__,
+                _cache_key.key,
+                _params,
+                tuple(sorted(stmt.get_execution_options().items())),
+            )
+            hash(_key)
+        except TypeError:
+            return None
+        return _key
+
+    async def _execute_select(self, stmt):
+        return await self.session.execute(
+            stmt, execution_options={"compiled_cache": BaseRepository._compiled_cache}
+        )
+
+    async def _run_cached_select(self, stmt, handler):
+        _cache: OrderedDict | None = self.session.info.get(STMT_CACHE_KEY)
+        _key = self._stmt_cache_key(stmt, handler) if _cache is not None and isinstance(stmt, Select) else None
+        if _key is None:
+            return handler(await self._execute_select(stmt))
+        if _key in _cache:
+            _cache.move_to_end(_key)
+            return _stmt_cache_copy(_cache[_key])
+        _value = handler(await self._execute_select(stmt))
+        _cache[_key] = _stmt_cache_copy(_value)
+        if len(_cache) > self._stmt_cache_size:
+            _cache.popitem(last=False)
+        return _value
+
+    @staticmethod
+    def _rows_from_instances(model: type[T], instances: list[T]) -> list[dict]:
+        # A column is left out only when it has a default and is None in every row, so all rows
+        # keep the same key set (one batched INSERT) and explicit NULLs elsewhere are preserved
+        _names, _, _ = model._col_cache()
+        _values = [_instance._col_values() for _instance in instances]
+        _table = model.__table__
+        _keep = [
+            i for i, _column in enumerate(_table.columns)
+            if not (
+                (_column.default is not None or _column.server_default is not None
+                 or _column is _table.autoincrement_column)
+                and all(_row[i] is None for _row in _values)
+            )
+        ]
+        return [{_names[i]: _row[i] for i in _keep} for _row in _values]
+
     @staticmethod
     async def _insert_instance(instance: T, db: AsyncSession) -> T:
+        # The mapper default eager_defaults="auto" fetches server defaults through the flush's
+        # INSERT ... RETURNING where the dialect supports it, so no refresh() round trip is needed
         db.add(instance)
         await db.commit()
-        await db.refresh(instance)
         return instance
 
     async def run_select_stmt_for_one(self, stmt) -> T:
-        result = await self.session.execute(stmt)
-        return result.scalar()
+        return await self._run_cached_select(stmt, lambda result: result.scalar())
 
     async def run_select_stmt_for_all(self, stmt) -> list[T]:
-        result = await self.session.execute(stmt)
-        return cast(list[T], result.scalars().all())
+        return await self._run_cached_select(stmt, lambda result: cast(list[T], result.scalars().all()))
 
-    async def run_select_stmt_for_all_with_unique_dict(self, stmt) -> list[dict]:
-        _result = await self.session.execute(stmt)
-        _rows = _result.unique().all()
-        _result_dict = [BaseRepository.as_dict(_row) for _row in _rows]
-        return _result_dict
+    async def run_select_stmt_for_all_with_unique_dict(self, stmt) -> Sequence[RowMapping]:
+        return await self._run_cached_select(stmt, lambda result: result.mappings().unique().all())
 
-    async def run_select_stmt_for_all_with_dict(self, stmt):
-        _result = await self.session.execute(stmt)
-        _rows = _result.all()
-        _result_dict = [BaseRepository.as_dict(_row) for _row in _rows]
-        return _result_dict
+    async def run_select_stmt_for_all_with_dict(self, stmt) -> Sequence[RowMapping]:
+        return await self._run_cached_select(stmt, lambda result: result.mappings().all())
 
     async def run_select_stmt_for_all_with_unique_entity(self, stmt) -> list[T]:
-        _result = await self.session.execute(stmt)
-        _rows = _result.unique().all()
-        return [_row[0] for _row in _rows]
+        def _handler(_result):
+            _rows = _result.unique().all()
+            return [_row[0] for _row in _rows]
+
+        return await self._run_cached_select(stmt, _handler)
 
     async def run_select_stmt_for_one_with_unique_entity(self, stmt) -> T:
-        _result = await self.session.execute(stmt)
-        _rows = _result.unique().first()
-        return _rows[0] if _rows else None
+        def _handler(_result):
+            _rows = _result.unique().first()
+            return _rows[0] if _rows else None
+
+        return await self._run_cached_select(stmt, _handler)
 
     async def run_select_stmt_for_one_with_dict(self, stmt) -> dict:
-        _result = await self.session.execute(stmt)
-        _rows = _result.first()
-        return BaseRepository.as_dict(_rows)
+        def _handler(_result):
+            _rows = _result.first()
+            return BaseRepository.as_dict(_rows)
+
+        return await self._run_cached_select(stmt, _handler)
 
     async def paginated_select_entity(
             self, stmt: Select, page_size: int, page_number: int
@@ -95,24 +202,87 @@ class BaseRepository(Generic[T]):
         await self.session.commit()
         return instance
 
-    async def insert_many_orm_with_commit(self, instances: Iterable[T]) -> list[T]:
+    async def insert_many_orm_with_commit(self, instances: Iterable[T], refresh: bool = False) -> list[T]:
+        instances = list(instances)
         self.session.add_all(instances)
         await self.session.commit()
-        await self.session.refresh(instances)
-        return cast(list, instances)
+        if refresh:
+            # AsyncSession does not allow concurrent operations, refresh one by one
+            for instance in instances:
+                await self.session.refresh(instance)
+        return instances
 
-    async def bulk_insert_orm_without_commit(self, instances: Iterable[T]) -> list[T]:
+    async def bulk_insert_values(self, model: type[T], rows: list[dict], fast: bool = False) -> None:
+        if not rows:
+            return
+        if fast:
+            # Commit stops waiting for the WAL flush, a crash may lose the last few ms of
+            # committed transactions (no corruption). Scoped to the current transaction only.
+            await self.session.execute(text("SET LOCAL synchronous_commit = OFF"))
+        # render_nulls keeps None as NULL instead of dropping the key per row, which would
+        # split the batch by key set and let column defaults replace explicit NULLs
+        await self.session.execute(insert(model), rows, execution_options={"render_nulls": True})
+
+    async def bulk_insert_orm_without_commit(self, instances: Iterable[T], fast: bool = False) -> list[T]:
+        instances = list(instances)
+        if not instances:
+            return instances
+        _model = type(instances[0])
+        await self.bulk_insert_values(_model, BaseRepository._rows_from_instances(_model, instances), fast=fast)
+        return instances
+
+    async def bulk_save_objects_without_commit(self, instances: Iterable[T]) -> list[T]:
+        warnings.warn(
+            "bulk_save_objects_without_commit is deprecated, use bulk_insert_orm_without_commit",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         await self.session.run_sync(lambda ses: ses.bulk_save_objects(instances))
+        # bulk_save_objects bypasses flush and ORM execute events
+        _clear_stmt_cache(self.session)
         return cast(list, instances)
 
-    async def bulk_insert_core_without_commit(self, instances: Iterable[dict], mapping) -> list[T]:
-        await self.session.run_sync(lambda ses: ses.bulk_insert_mappings(mapping, instances))
+    async def bulk_insert_core_without_commit(
+            self, instances: Iterable[dict], mapping, dedup_key: tuple[str, ...] | None = None
+    ) -> list[T]:
+        if dedup_key:
+            # Keeps the first row per key, in input order
+            _seen = set()
+            instances = [
+                _row for _row in instances
+                if (_key := tuple(_row[c] for c in dedup_key)) not in _seen and not _seen.add(_key)
+            ]
+        else:
+            instances = list(instances)
+        await self.bulk_insert_values(mapping, instances)
         return cast(list, instances)
 
     async def del_exist_instance(self, instance: T):
         await self.session.delete(instance)
 
-    async def del_exist_instances(self, instances: Iterable[T]):
+    async def _del_instances_by_pk(self, instances: Iterable[T], model: type[T] | None = None):
+        instances = list(instances)
+        if not instances:
+            return
+        model = model or type(instances[0])
+        _ids = []
+        for _instance in instances:
+            if not isinstance(_instance, model):
+                raise TypeError(f"Cannot delete {type(_instance).__name__} as {model.__name__}")
+            if _instance.id is None:
+                raise ValueError(f"Cannot delete {model.__name__} without id, it is not persisted")
+            _ids.append(_instance.id)
+        await self.session.execute(delete(model).where(model.id.in_(_ids)))
+
+    async def del_exist_instances(self, instances: Iterable[T], model: type[T] | None = None):
+        await self._del_instances_by_pk(instances, model)
+
+    async def del_exist_instances_orm(self, instances: Iterable[T]):
+        warnings.warn(
+            "del_exist_instances_orm is deprecated, use del_exist_instances",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         for instance in instances:
             await self.session.delete(instance)
 
@@ -122,9 +292,33 @@ class BaseRepository(Generic[T]):
     async def run_delete_stmt_without_commit(self, stmt):
         await self.session.execute(stmt)
 
-    async def del_exist_instances_without_commit(self, instances: Iterable[T]):
+    async def del_exist_instances_without_commit(self, instances: Iterable[T], model: type[T] | None = None):
+        await self._del_instances_by_pk(instances, model)
+
+    async def del_exist_instances_orm_without_commit(self, instances: Iterable[T]):
+        warnings.warn(
+            "del_exist_instances_orm_without_commit is deprecated, use del_exist_instances_without_commit",
+            DeprecationWarning,
+            stacklevel=2,
+        )
         for instance in instances:
             await self.session.delete(instance)
 
+    async def bulk_update_by_pk(self, model: type[T], rows: list[dict]) -> None:
+        if not rows:
+            return
+        await self.session.execute(update(model), rows)
+
+    async def update_instances_without_commit(self, instances: Iterable[T], **payload) -> list[T]:
+        instances = list(instances)
+        if not instances:
+            return instances
+        await self.bulk_update_by_pk(type(instances[0]), [{"id": _instance.id, **payload} for _instance in instances])
+        # Bulk UPDATE by primary key does not touch loaded objects, sync them without marking dirty
+        for _instance in instances:
+            for k, v in payload.items():
+                set_committed_value(_instance, k, v)
+        return instances
+
     async def update_stmt(self, stmt):
         await self.session.execute(stmt)
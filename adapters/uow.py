@@ -1,24 +1,32 @@
 import functools
+import logging
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from typing import Type, Callable, TypeVar
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from adapters.postgres import AsyncSQLAlchemyAdapter
-from adapters.repository import BaseRepository
+from adapters.repository import BaseRepository, STMT_CACHE_KEY, register_stmt_cache_events
 
 REPO = TypeVar("REPO", bound=BaseRepository)
+ATOMIC_DEPTH_KEY = "_atomic_depth"
 
 
 class SQLAlchemyUnitOfWork:
     def __init__(self,
                  sqlalchemy_adapter: AsyncSQLAlchemyAdapter,
-                 repositories: set[REPO],
-                 log: bool = False) -> None:
+                 repositories: set[REPO] | dict[str, REPO],
+                 log: bool = False,
+                 logger: logging.Logger | None = None) -> None:
         self._sqlalchemy_adapter = sqlalchemy_adapter
-        self._repositories = repositories
+        self._scoped_session = sqlalchemy_adapter.async_scoped_session
+        register_stmt_cache_events(sqlalchemy_adapter.sync_session_class)
+        self._repositories: dict[str, REPO] = (
+            repositories if isinstance(repositories, dict) else {_repo.name: _repo for _repo in repositories}
+        )
         self._session = None
-        self._log = log
+        self._logger = logger or (logging.getLogger(__name__) if log else None)
 
     @property
     def session(self) -> AsyncSession:
@@ -34,21 +42,42 @@ class SQLAlchemyUnitOfWork:
 
     @asynccontextmanager
     async def atomic(self, read_only: bool = False) -> AsyncSession:
-        async with self.sqlalchemy_adapter.async_scoped_session() as _session:
+        _session = self._scoped_session()
+        self.session = _session
+        if _session.info.get(ATOMIC_DEPTH_KEY):
+            # Nested atomic() in the same task reuses the session under a savepoint
+            # and read_only rolls the savepoint back instead of releasing it
+            _session.info[ATOMIC_DEPTH_KEY] += 1
+            _nested = await _session.begin_nested()
             try:
-                self.session = _session
-                if self._log:
-                    print(_session.bind.pool.status(), "AT START")
                 yield _session
-                if not read_only:
-                    await _session.commit()
+                if read_only:
+                    await _nested.rollback()
+                else:
+                    await _nested.commit()
             except Exception as e:
-                await _session.rollback()
+                await _nested.rollback()
                 raise e
             finally:
-                await _session.close()
-            if self._log:
-                print(_session.bind.pool.status(), "AT END")
+                _session.info[ATOMIC_DEPTH_KEY] -= 1
+            return
+        _session.info[ATOMIC_DEPTH_KEY] = 1
+        _session.info[STMT_CACHE_KEY] = OrderedDict()
+        try:
+            if self._logger and self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug("pool=%s at start", _session.bind.pool.status())
+            yield _session
+            if not read_only:
+                await _session.commit()
+        except Exception as e:
+            await _session.rollback()
+            raise e
+        finally:
+            _session.info.pop(STMT_CACHE_KEY, None)
+            _session.info.pop(ATOMIC_DEPTH_KEY, None)
+            await self._scoped_session.remove()
+        if self._logger and self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("pool=%s at end", _session.bind.pool.status())
 
     def transactional(self):
 
@@ -73,10 +102,9 @@ class SQLAlchemyUnitOfWork:
         await self._session.rollback()
 
     def get_repository(self, repository: Type[REPO]) -> REPO:
-        _founded_repo = None
-        for _repo in self._repositories:
-            if _repo.name == repository.__name__:
-                _founded_repo = _repo
-                break
+        _founded_repo = self._repositories[repository.__name__]
         _founded_repo.session = self._session
         return _founded_repo
+
+
+PgSQLAlchemyUnitOfWork = SQLAlchemyUnitOfWork
@@ -2,6 +2,8 @@ import datetime
 import re
 import uuid
 from enum import StrEnum
+from functools import lru_cache
+from operator import attrgetter
 from typing import TypeVar
 
 from pydantic.alias_generators import to_camel
@@ -14,26 +16,43 @@ from typing_extensions import Annotated
 _FACTORY_CLS = TypeVar("_FACTORY_CLS", bound="BaseModel")
 
 
+_CAMEL_WORD_RE = re.compile("(.)([A-Z][a-z]+)")
+_DOUBLE_UNDERSCORE_RE = re.compile("__([A-Z])")
+_LOWER_UPPER_RE = re.compile("([a-z0-9])([A-Z])")
+
+
+@lru_cache(maxsize=512)
 def to_snake_case(name):
-    name = re.sub("(.)([A-Z][a-z]+)", r"\1_\2", name)
-    name = re.sub("__([A-Z])", r"_\1", name)
-    name = re.sub("([a-z0-9])([A-Z])", r"\1_\2", name)
+    name = _CAMEL_WORD_RE.sub(r"\1_\2", name)
+    name = _DOUBLE_UNDERSCORE_RE.sub(r"_\1", name)
+    name = _LOWER_UPPER_RE.sub(r"\1_\2", name)
     return name.lower()
 
 
-int_col = mapped_column(BIGINT)
-uuid_col = mapped_column(UUID(as_uuid=True))
+# Factories, so every direct `= int_col()` assignment gets its own mapped_column
+def int_col():
+    return mapped_column(BIGINT)
+
+
+def uuid_col():
+    return mapped_column(UUID(as_uuid=True))
+
+
+def int_pk_col():
+    return mapped_column(BIGINT, primary_key=True, autoincrement=True)
+
+
+def uuid_pk_col():
+    return mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
-int_pk_col = mapped_column(BIGINT, primary_key=True, autoincrement=True)
-uuid_pk_col = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
 # Annotated types for IDs (without auto-increment or default)
-int_annotated = Annotated[int, int_col]
-uuid_annotated = Annotated[uuid.UUID, uuid_col]
+int_annotated = Annotated[int, int_col()]
+uuid_annotated = Annotated[uuid.UUID, uuid_col()]
 
 # Annotated types for primary key IDs (with auto-increment or default)
-int_pk_annotated = Annotated[int, int_pk_col]
-uuid_pk_annotated = Annotated[uuid.UUID, uuid_pk_col]
+int_pk_annotated = Annotated[int, int_pk_col()]
+uuid_pk_annotated = Annotated[uuid.UUID, uuid_pk_col()]
 
 created_at = Annotated[
     datetime.datetime,
@@ -81,14 +100,28 @@ class BaseModel(DeclarativeBase):
     def factory(cls: type, **kwargs) -> _FACTORY_CLS:
         return cls(**kwargs)
 
+    @classmethod
+    def _col_cache(cls) -> tuple[tuple[str, ...], tuple[str, ...], attrgetter]:
+        _cache = cls.__dict__.get("__col_cache__")
+        if _cache is None:
+            _names = tuple(c.name for c in cls.__table__.columns)  # type: ignore
+            _cache = (_names, tuple(to_camel(n) for n in _names), attrgetter(*_names))
+            cls.__col_cache__ = _cache
+        return _cache
+
+    def _col_values(self) -> tuple:
+        _names, _, _getter = self._col_cache()
+        _values = _getter(self)
+        return _values if len(_names) > 1 else (_values,)
+
     def to_dict(self, camel_case: bool = False):
-        if camel_case:
-            return {to_camel(c.name): getattr(self, c.name) for c in self.__table__.columns}  # type: ignore
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}  # type: ignore
+        _names, _camel_names, _ = self._col_cache()
+        return dict(zip(_camel_names if camel_case else _names, self._col_values()))
 
     def merge_tables_output(self, output):
-        for c in output.__table__.columns:
-            setattr(self, c.name, getattr(output, c.name))
+        _names, _, _ = output._col_cache()
+        for _name, _value in zip(_names, output._col_values()):
+            setattr(self, _name, _value)
         return self
 
     def update(self, **kwargs):
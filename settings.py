@@ -20,9 +20,22 @@ def generate_aes_key(length=32):
     return "".join(secrets.choice(alphabet) for i in range(length))
 
 
-SECRET_KEY_32 = f"{generate_secret(32)}"
-SECRET_KEY_64 = f"{generate_secret(64)}"
-SECRET_KEY_32_AES = f"{generate_aes_key(32)}"
+@lru_cache
+def _defaults() -> tuple[str, str]:
+    return generate_secret(32), generate_secret(64)
+
+
+@lru_cache
+def _aes_default() -> str:
+    return generate_aes_key(32)
+
+
+def _secret_key_32() -> SecretStr:
+    return SecretStr(_defaults()[0])
+
+
+def _secret_key_64() -> SecretStr:
+    return SecretStr(_defaults()[1])
 
 
 class CustomSettings(BaseSettings):
@@ -47,6 +60,11 @@ class DbSettings(AppSettings):
     POSTGRES_HOST: str = Field(default=..., alias="POSTGRES_HOST")
     POSTGRES_PORT: int = Field(default=..., alias="POSTGRES_PORT")
     SQLALCHEMY_DATABASE_URI: PostgresDsn
+    DB_POOL_SIZE: int = Field(default=20, alias="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=30, alias="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: float = Field(default=30, alias="DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: int = Field(default=1800, alias="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(default=True, alias="DB_POOL_PRE_PING")
 
     @model_validator(mode="before")
     def validate_postgres_dsn(cls, data: dict):
@@ -65,8 +83,8 @@ class DbSettings(AppSettings):
 
 class ApiSettings(CustomSettings):
     API_V1_PREFIX: str = "/api/v1"
-    API_KEY: SecretStr = Field(default=f"{SECRET_KEY_32}")
-    API_SECRET: SecretStr = Field(default=f"{SECRET_KEY_32}")
+    API_KEY: SecretStr = Field(default_factory=_secret_key_32)
+    API_SECRET: SecretStr = Field(default_factory=_secret_key_32)
 
 
 class S3Settings(CustomSettings):
@@ -77,13 +95,13 @@ class S3Settings(CustomSettings):
 
 
 class JWTSettings(CustomSettings):
-    JWT_ACCESS_SECRET: SecretStr = Field(default=f"{SECRET_KEY_64}")
+    JWT_ACCESS_SECRET: SecretStr = Field(default_factory=_secret_key_64)
     JWT_ALGORITHM: str = Field(default="HS256")
     VERIFICATION_MINUTES: int = Field(default=30)
 
 
 class OpenAISettings(CustomSettings):
-    OPENAI_API_KEY: SecretStr = Field(default=f"{SECRET_KEY_32}")
+    OPENAI_API_KEY: SecretStr = Field(default_factory=_secret_key_32)
 
 
 class RabbitMQSettings(AppSettings):
@@ -153,6 +171,16 @@ def get_settings() -> Settings:
     return Settings()
 
 
-SETTINGS = get_settings()
+_LAZY_ATTRIBUTES = {
+    "SETTINGS": get_settings,
+    "SECRET_KEY_32": lambda: _defaults()[0],
+    "SECRET_KEY_64": lambda: _defaults()[1],
+    "SECRET_KEY_32_AES": _aes_default,
+}
+
 
-print(SETTINGS.RABBITMQ)
+def __getattr__(name: str):
+    # Resolved on first access so importing this module stays side-effect free
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
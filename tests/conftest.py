@@ -0,0 +1,59 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import Integer, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from adapters.postgres import AsyncSQLAlchemyAdapter
+from adapters.repository import BaseRepository
+from adapters.uow import SQLAlchemyUnitOfWork
+from entities.base import BaseModel
+
+
+class CacheUser(BaseModel):
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(50))
+
+
+class CacheNote(BaseModel):
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    note: Mapped[str | None] = mapped_column(String(50), nullable=True, default="dflt")
+
+
+class CacheUserRepository(BaseRepository[CacheUser]):
+    pass
+
+
+@contextmanager
+def capture_statements(adapter: AsyncSQLAlchemyAdapter):
+    _statements = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _statements.append(statement)
+
+    event.listen(adapter.engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield _statements
+    finally:
+        event.remove(adapter.engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@pytest.fixture
+def run_uow(tmp_path):
+    def _run(test_func):
+        async def _main():
+            _adapter = AsyncSQLAlchemyAdapter(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", pool_size=2)
+            async with _adapter.engine.begin() as _conn:
+                await _conn.run_sync(BaseModel.metadata.create_all)
+            try:
+                await test_func(SQLAlchemyUnitOfWork(_adapter, {CacheUserRepository()}))
+            finally:
+                await _adapter.dispose()
+
+        asyncio.run(_main())
+
+    return _run
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from adapters.postgres import AsyncSQLAlchemyAdapter
+
+
+def test_prewarm_clamps_to_pool_size_and_returns_connections(tmp_path, monkeypatch):
+    _start = AsyncConnection.start
+    _calls = []
+
+    async def _counting_start(self, *args, **kwargs):
+        _calls.append(None)
+        return await _start(self, *args, **kwargs)
+
+    async def _main():
+        adapter = AsyncSQLAlchemyAdapter(
+            f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", pool_size=2, max_overflow=1, pool_timeout=1
+        )
+        monkeypatch.setattr(AsyncConnection, "start", _counting_start)
+        try:
+            await adapter.prewarm(10)
+            assert len(_calls) == 2
+            assert adapter.engine.pool.checkedout() == 0
+            assert adapter.engine.pool.checkedin() == 2
+        finally:
+            await adapter.dispose()
+
+    asyncio.run(_main())
+
+
+def test_prewarm_closes_opened_connections_on_failure(tmp_path, monkeypatch):
+    _start = AsyncConnection.start
+    _calls = []
+
+    async def _flaky_start(self, *args, **kwargs):
+        _calls.append(None)
+        if len(_calls) == 2:
+            raise ConnectionError("boom")
+        return await _start(self, *args, **kwargs)
+
+    async def _main():
+        adapter = AsyncSQLAlchemyAdapter(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", pool_size=3)
+        monkeypatch.setattr(AsyncConnection, "start", _flaky_start)
+        try:
+            with pytest.raises(ConnectionError):
+                await adapter.prewarm()
+            assert adapter.engine.pool.checkedout() == 0
+            assert adapter.engine.pool.checkedin() == 2
+        finally:
+            await adapter.dispose()
+
+    asyncio.run(_main())
+
+
+def test_from_settings_passes_pool_settings(monkeypatch):
+    pytest.importorskip("asyncpg")
+    from settings import DbSettings
+
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "3")
+    adapter = AsyncSQLAlchemyAdapter.from_settings(DbSettings())
+    assert adapter.engine.pool.size() == 7
+    assert adapter.engine.pool._max_overflow == 3
+    assert adapter.engine.pool._pre_ping is True
+    assert adapter.engine.pool._recycle == 1800
@@ -0,0 +1,239 @@
+import pytest
+from sqlalchemy import Select, event, select, update
+from sqlalchemy.orm import Session, defer
+
+from adapters.repository import BaseRepository, _clear_stmt_cache
+from tests.conftest import CacheNote, CacheUser, CacheUserRepository, capture_statements
+
+
+def test_select_cache_is_separate_per_helper(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            session.add(CacheUser(name="a"))
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            stmt = select(CacheUser)
+            one = await repo.run_select_stmt_for_one(stmt)
+            many = await repo.run_select_stmt_for_all(stmt)
+            assert isinstance(one, CacheUser)
+            assert many == [one]
+
+    run_uow(_test)
+
+
+def test_select_cache_hit_returns_stored_value(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            session.add(CacheUser(name="a"))
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            first = await repo.run_select_stmt_for_all(select(CacheUser.name))
+            with capture_statements(uow.sqlalchemy_adapter) as statements:
+                second = await repo.run_select_stmt_for_all(select(CacheUser.name))
+            assert statements == []
+            assert first == second
+
+    run_uow(_test)
+
+
+def test_select_cache_cleared_by_session_flush(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            repo = uow.get_repository(CacheUserRepository)
+            assert await repo.run_select_stmt_for_all(select(CacheUser.name)) == []
+            session.add(CacheUser(name="a"))
+            await session.flush()
+            assert await repo.run_select_stmt_for_all(select(CacheUser.name)) == ["a"]
+            await uow.commit()
+            session.add(CacheUser(name="b"))
+            await session.flush()
+            assert await repo.run_select_stmt_for_all(select(CacheUser.name)) == ["a", "b"]
+
+    run_uow(_test)
+
+
+def test_select_cache_cleared_by_dml_execute(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            session.add(CacheUser(name="a"))
+        async with uow.atomic() as session:
+            repo = uow.get_repository(CacheUserRepository)
+            assert await repo.run_select_stmt_for_all(select(CacheUser.name)) == ["a"]
+            await session.execute(update(CacheUser).values(name="b"))
+            assert await repo.run_select_stmt_for_all(select(CacheUser.name)) == ["b"]
+
+    run_uow(_test)
+
+
+def test_stmt_cache_key_distinguishes_values_and_options():
+    def _handler(result):
+        return result
+
+    def _key(stmt):
+        return BaseRepository._stmt_cache_key(stmt, _handler)
+
+    base = select(CacheUser).where(CacheUser.id == 1)
+    assert _key(base) == _key(select(CacheUser).where(CacheUser.id == 1))
+    assert _key(base) != _key(select(CacheUser).where(CacheUser.id == 2))
+    assert _key(base) != _key(base.options(defer(CacheUser.name)))
+    assert _key(base) != _key(base.execution_options(populate_existing=True))
+    assert _key(base) != BaseRepository._stmt_cache_key(base, lambda result: result)
+    assert _key(select(CacheUser).where(CacheUser.id.in_([1, 2]))) is not None
+
+
+def test_cached_select_compiles_once_per_statement_shape(run_uow, monkeypatch):
+    _compile = Select.compile
+    _calls = []
+
+    def _counting_compile(self, *args, **kwargs):
+        _calls.append(self)
+        return _compile(self, *args, **kwargs)
+
+    async def _test(uow):
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            BaseRepository._compiled_cache.clear()
+            monkeypatch.setattr(Select, "compile", _counting_compile)
+            await repo.run_select_stmt_for_all(select(CacheUser).where(CacheUser.id == 1))
+            await repo.run_select_stmt_for_all(select(CacheUser).where(CacheUser.id == 2))
+            assert len(_calls) == 1
+            assert len(BaseRepository._compiled_cache) == 1
+
+    run_uow(_test)
+
+
+def test_insert_one_with_commit_populates_same_instance(run_uow):
+    async def _test(uow):
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            user = CacheUser(name="a")
+            inserted = await repo.insert_one_with_commit(user)
+            assert inserted is user
+            assert user.id is not None
+            assert user.created_at is not None
+
+    run_uow(_test)
+
+
+def test_bulk_insert_orm_without_commit_keeps_nulls_in_one_insert(run_uow):
+    async def _test(uow):
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            with capture_statements(uow.sqlalchemy_adapter) as statements:
+                await repo.bulk_insert_orm_without_commit(
+                    [CacheNote(note="a"), CacheNote(note=None), CacheNote(note="c")]
+                )
+            assert len([s for s in statements if s.startswith("INSERT")]) == 1
+            notes = await repo.run_select_stmt_for_all(select(CacheNote.note).order_by(CacheNote.id))
+            assert list(notes) == ["a", None, "c"]
+
+    run_uow(_test)
+
+
+def test_bulk_insert_orm_without_commit_applies_defaults(run_uow):
+    async def _test(uow):
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            await repo.bulk_insert_orm_without_commit([CacheUser(name="a"), CacheUser(name="b")])
+            users = await repo.run_select_stmt_for_all(select(CacheUser).order_by(CacheUser.id))
+            assert [(u.id, u.name) for u in users] == [(1, "a"), (2, "b")]
+            assert all(u.created_at is not None for u in users)
+
+    run_uow(_test)
+
+
+def test_select_cache_hit_is_isolated_from_caller_mutation(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            session.add_all([CacheUser(name="a"), CacheUser(name="b")])
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            stmt = select(CacheUser.name).order_by(CacheUser.name)
+            names = await repo.run_select_stmt_for_all(stmt)
+            names.append("junk")
+            cached = await repo.run_select_stmt_for_all(stmt)
+            assert cached == ["a", "b"]
+            cached.append("junk")
+            assert await repo.run_select_stmt_for_all(stmt) == ["a", "b"]
+
+    run_uow(_test)
+
+
+def test_select_cache_cleared_by_bulk_save_objects(run_uow):
+    async def _test(uow):
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            assert await repo.run_select_stmt_for_all(select(CacheUser.name)) == []
+            with pytest.warns(DeprecationWarning):
+                await repo.bulk_save_objects_without_commit([CacheUser(name="z")])
+            assert await repo.run_select_stmt_for_all(select(CacheUser.name)) == ["z"]
+
+    run_uow(_test)
+
+
+def test_select_cache_events_are_scoped_to_adapter_session_class(run_uow):
+    async def _test(uow):
+        assert event.contains(uow.sqlalchemy_adapter.sync_session_class, "after_flush", _clear_stmt_cache)
+        assert not event.contains(Session, "after_flush", _clear_stmt_cache)
+
+    run_uow(_test)
+
+
+def test_update_instances_without_commit_uses_one_update_and_syncs_instances(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            session.add_all([CacheUser(name="a"), CacheUser(name="b")])
+        async with uow.atomic() as session:
+            repo = uow.get_repository(CacheUserRepository)
+            users = list((await session.execute(select(CacheUser))).scalars())
+            with capture_statements(uow.sqlalchemy_adapter) as statements:
+                await repo.update_instances_without_commit(users, name="z")
+            assert len([s for s in statements if s.startswith("UPDATE")]) == 1
+            assert [u.name for u in users] == ["z", "z"]
+            assert not session.dirty
+            assert not any(session.is_modified(u) for u in users)
+        async with uow.atomic() as session:
+            assert list((await session.execute(select(CacheUser.name))).scalars()) == ["z", "z"]
+
+    run_uow(_test)
+
+
+def test_update_instances_without_commit_empty_input_is_noop(run_uow):
+    async def _test(uow):
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            with capture_statements(uow.sqlalchemy_adapter) as statements:
+                assert await repo.update_instances_without_commit([], name="z") == []
+            assert statements == []
+
+    run_uow(_test)
+
+
+def test_del_exist_instances_issues_one_delete_and_detaches_instances(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            session.add_all([CacheUser(name="a"), CacheUser(name="b"), CacheUser(name="c")])
+        async with uow.atomic() as session:
+            repo = uow.get_repository(CacheUserRepository)
+            users = list((await session.execute(select(CacheUser).order_by(CacheUser.name))).scalars())
+            with capture_statements(uow.sqlalchemy_adapter) as statements:
+                await repo.del_exist_instances(users[:2])
+            assert len([s for s in statements if s.startswith("DELETE")]) == 1
+            assert users[0] not in session and users[1] not in session
+            assert users[2] in session
+        async with uow.atomic() as session:
+            assert list((await session.execute(select(CacheUser.name))).scalars()) == ["c"]
+
+    run_uow(_test)
+
+
+def test_del_exist_instances_rejects_pending_and_foreign_instances(run_uow):
+    async def _test(uow):
+        async with uow.atomic():
+            repo = uow.get_repository(CacheUserRepository)
+            with pytest.raises(ValueError):
+                await repo.del_exist_instances([CacheUser(name="a")])
+            with pytest.raises(TypeError):
+                await repo.del_exist_instances([CacheUser(id=1, name="a"), CacheNote(id=1)])
+
+    run_uow(_test)
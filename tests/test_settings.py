@@ -0,0 +1,20 @@
+import importlib
+
+import settings
+
+
+def test_import_does_not_generate_secrets():
+    importlib.reload(settings)
+    assert settings._defaults.cache_info().misses == 0
+    assert settings.SETTINGS is settings.get_settings()
+    assert settings._defaults.cache_info().misses == 1
+    assert settings._aes_default.cache_info().misses == 0
+
+
+def test_legacy_secret_names_resolve_lazily():
+    importlib.reload(settings)
+    assert settings.SECRET_KEY_32 == settings.get_settings().API_V1.API_KEY.get_secret_value()
+    assert len(settings.SECRET_KEY_64) > len(settings.SECRET_KEY_32)
+    assert settings._aes_default.cache_info().misses == 0
+    assert len(settings.SECRET_KEY_32_AES) == 32
+    assert settings.SECRET_KEY_32_AES == settings.SECRET_KEY_32_AES
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import select
+
+from adapters.repository import STMT_CACHE_KEY
+from adapters.uow import ATOMIC_DEPTH_KEY
+from tests.conftest import CacheUser
+
+
+async def _names(uow):
+    async with uow.atomic() as session:
+        return list((await session.execute(select(CacheUser.name).order_by(CacheUser.name))).scalars())
+
+
+def test_nested_atomic_reuses_session(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as outer:
+            async with uow.atomic() as inner:
+                assert inner is outer
+                assert outer.info[ATOMIC_DEPTH_KEY] == 2
+            assert outer.info[ATOMIC_DEPTH_KEY] == 1
+
+    run_uow(_test)
+
+
+def test_failing_nested_atomic_rolls_back_only_its_savepoint(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            session.add(CacheUser(name="a"))
+            with pytest.raises(RuntimeError):
+                async with uow.atomic():
+                    session.add(CacheUser(name="b"))
+                    await session.flush()
+                    raise RuntimeError
+            session.add(CacheUser(name="c"))
+        assert await _names(uow) == ["a", "c"]
+
+    run_uow(_test)
+
+
+def test_read_only_nested_atomic_rolls_back_savepoint(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            session.add(CacheUser(name="a"))
+            async with uow.atomic(read_only=True):
+                session.add(CacheUser(name="b"))
+                await session.flush()
+        assert await _names(uow) == ["a"]
+
+    run_uow(_test)
+
+
+def test_outer_atomic_cleans_up_session_state(run_uow):
+    async def _test(uow):
+        async with uow.atomic() as session:
+            async with uow.atomic():
+                pass
+        assert ATOMIC_DEPTH_KEY not in session.info
+        assert STMT_CACHE_KEY not in session.info
+        assert not uow.sqlalchemy_adapter.async_scoped_session.registry.has()
+
+    run_uow(_test)